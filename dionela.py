@@ -1,13 +1,307 @@
 import cv2
+import numpy as np
+import os
+import queue
+import shutil
+import threading
 import time
 import sys
 
+# Decimal ASCII bytes for every channel value, so ANSI color codes can be
+# assembled by table lookup instead of formatting each pixel's ints as text.
+DEC = np.array([f"{i}".encode() for i in range(256)], dtype=object)
+
+# ANSI escape sequences, kept as bytes so frames never pass through str
+CURSOR_HOME = b"\033[H"  # move the cursor to the top-left
+FG_PREFIX = b"\033[38;2;"  # start of a truecolor foreground code: \033[38;2;R;G;B m
+BG_PREFIX = b"\033[48;2;"  # start of a truecolor background code: \033[48;2;R;G;B m
+DEFAULT_BG = b"\033[49m"  # back to the terminal's own background color
+RESET = b"\033[0m"
+
+# Complete 256-color codes (\033[38;5;N m / \033[48;5;N m) for every palette index
+FG_256 = b"\033[38;5;" + DEC + b"m"
+BG_256 = b"\033[48;5;" + DEC + b"m"
+LINE_END = RESET + b"\n"  # reset color at the end of every line
+CURSOR_FORWARD = b"\033[%dC"  # move the cursor right N cells without erasing them
+
+# Most chunks os.writev accepts in one call (POSIX guarantees at least 16).
+# sysconf returns -1 when the limit is indeterminate.
+try:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = -1
+if IOV_MAX <= 0:
+    IOV_MAX = 16
+
+# Half-block glyphs: indexed by "is the top pixel drawn", so 1 -> upper half (▀)
+HALF_BLOCKS = np.array(["\u2584".encode(), "\u2580".encode()], dtype=object)
+
+
+# Color key of the terminal's default background, above any 24-bit color
+DEFAULT_KEY = np.uint32(1 << 24)
+
+
+def default_interpolation(downscale):
+    """
+    Pick the cv2.resize interpolation for a downscale factor. INTER_AREA's box
+    filter is worth its cost for mild downscales, but from 1/4 down every pixel
+    becomes a single letter anyway and a plain INTER_NEAREST gather looks the same.
+    """
+    return cv2.INTER_AREA if downscale >= 0.25 else cv2.INTER_NEAREST
+
+
+def downscale_frame(frame, size, interpolation):
+    """
+    Resize 'frame' to 'size' (width, height) with the given cv2 interpolation.
+
+    With INTER_AREA, the frame is first halved with cv2.pyrDown for as long as it
+    is still larger than 'size' and stays at least as large after halving; pyrDown
+    has tuned SIMD kernels and is much faster than a general area resize. Only the
+    remaining (< 2x) step, if any, goes through cv2.resize.
+    """
+    if interpolation == cv2.INTER_AREA:
+        w, h = size
+        # pyrDown of a single pixel is still a single pixel, so stop at the target
+        while (
+            (frame.shape[1] > w or frame.shape[0] > h)
+            and (frame.shape[1] + 1) // 2 >= w
+            and (frame.shape[0] + 1) // 2 >= h
+        ):
+            frame = cv2.pyrDown(frame)
+        if frame.shape[1] == w and frame.shape[0] == h:
+            return frame
+    return cv2.resize(frame, size, interpolation=interpolation)
+
+
+def background_mask(frame, threshold):
+    """
+    Mask of the background pixels of a BGR 'frame': 255 where B, G and R are all
+    <= the (B, G, R) 'threshold', 0 elsewhere. One vectorized cv2.inRange call.
+    """
+    return cv2.inRange(frame, (0, 0, 0), tuple(threshold))
+
+
+def pack_colors(b, g, r):
+    """Pack B, G, R channel arrays into one 24-bit 0xRRGGBB key per pixel."""
+    return (r.astype(np.uint32) << 16) | (g.astype(np.uint32) << 8) | b
+
+
+def cube_colors(b, g, r):
+    """
+    Quantize B, G, R channel arrays to the 6×6×6 color cube of the 256-color
+    palette (indices 16-231), one palette index per pixel.
+    """
+    qb = (b.astype(np.uint32) * 6) >> 8
+    qg = (g.astype(np.uint32) * 6) >> 8
+    qr = (r.astype(np.uint32) * 6) >> 8
+    return 16 + 36 * qr + 6 * qg + qb
+
+
+def run_starts(ys, keys):
+    """
+    Mark where a new run begins in cells listed in row-major order: at the first
+    cell of every line and wherever the key differs from the previous cell's.
+    """
+    starts = np.ones(len(ys), dtype=bool)
+    starts[1:] = (ys[1:] != ys[:-1]) | (keys[1:] != keys[:-1])
+    return starts
+
+
+def color_codes(keys, truecolor, background=False):
+    """
+    ANSI foreground (or background) color codes for an array of color keys:
+    packed 0xRRGGBB colors if 'truecolor', else 256-color palette indices.
+
+    Palette codes come straight from a 256-entry table. For truecolor, video
+    frames have far fewer distinct colors than pixels, so each code is
+    assembled once per distinct color and then gathered for every pixel.
+    """
+    if not truecolor:
+        return (BG_256 if background else FG_256)[keys]
+
+    prefix = BG_PREFIX if background else FG_PREFIX
+    unique, inverse = np.unique(keys, return_inverse=True)
+    codes = (
+        prefix
+        + DEC[unique >> 16] + b";"
+        + DEC[(unique >> 8) & 0xFF] + b";"
+        + DEC[unique & 0xFF] + b"m"
+    )
+    return codes[inverse]
+
+
+def letter_cells(keys, drawn, letter_cycle, letter_offset, truecolor=True):
+    """
+    Bytes for every terminal cell in letter mode: drawn pixels get the next letter
+    in the cycle (starting at 'letter_offset'), the rest a blank space.
+
+    'letter_cycle' is the repeating letter sequence, long enough to cover every
+    pixel of a frame from any offset below the number of letters.
+
+    Returns an (H, W) object array of bytes, one entry per cell.
+    """
+    # Coordinates and colors of the pixels that get a letter, in the
+    # row-major order they are printed in
+    ys, xs = np.nonzero(drawn)
+    drawn_keys = keys[ys, xs]
+
+    # Choose the next letters in "DIONELA"; only drawn pixels advance the cycle
+    letters_arr = letter_cycle[letter_offset:letter_offset + len(ys)]
+
+    # Only emit a color code when the color differs from the previous letter
+    # on the same line (spaces don't show a color, so they don't break a run).
+    # Every line starts with a fresh code since the previous one ended in a reset.
+    new_color = run_starts(ys, drawn_keys)
+    codes = np.full(len(ys), b"", dtype=object)
+    codes[new_color] = color_codes(drawn_keys[new_color], truecolor)
+
+    cells = np.full(drawn.shape, b" ", dtype=object)
+    cells[ys, xs] = codes + letters_arr
+    return cells
+
+
+def half_block_cells(keys, drawn, truecolor=True):
+    """
+    Bytes for every terminal cell in half-block mode, where each cell shows two
+    vertically stacked pixels: rows 2k and 2k+1 of the frame become line k.
+
+    The upper half block (▀) takes the top pixel's color as foreground and the
+    bottom pixel's as background. When only one of the two pixels is drawn it is
+    shown as a half block over the terminal's own background; when neither is,
+    the cell is a blank space.
+
+    Returns an (H // 2, W) object array of bytes, one entry per cell.
+    """
+    top, bottom = drawn[0::2], drawn[1::2]
+    top_keys, bottom_keys = keys[0::2], keys[1::2]
+    cells = np.full(top.shape, b" ", dtype=object)
+
+    # Foreground: the top pixel under ▀, or the bottom pixel under ▄ when it is
+    # the only one drawn
+    ys, xs = np.nonzero(top | bottom)
+    use_top = top[ys, xs]
+    fg_keys = np.where(use_top, top_keys[ys, xs], bottom_keys[ys, xs])
+    new_fg = run_starts(ys, fg_keys)
+    fg_codes = np.full(len(ys), b"", dtype=object)
+    fg_codes[new_fg] = color_codes(fg_keys[new_fg], truecolor)
+    cells[ys, xs] = fg_codes + HALF_BLOCKS[use_top.astype(np.intp)]
+
+    # Background: the bottom pixel behind ▀ when both are drawn, otherwise the
+    # terminal default. This is a separate run over every cell, since a colored
+    # background shows even behind a space.
+    bg_keys = np.where(top & bottom, bottom_keys, DEFAULT_KEY).ravel()
+    line = np.repeat(np.arange(top.shape[0]), top.shape[1])
+    new_bg = run_starts(line, bg_keys)
+    # Lines already start on the default background after the previous reset
+    new_bg[::top.shape[1]] &= bg_keys[::top.shape[1]] != DEFAULT_KEY
+    bg_codes = np.full(len(line), b"", dtype=object)
+    colored = new_bg & (bg_keys != DEFAULT_KEY)
+    bg_codes[colored] = color_codes(bg_keys[colored], truecolor, background=True)
+    bg_codes[new_bg & ~colored] = DEFAULT_BG
+
+    return bg_codes.reshape(top.shape) + cells
+
+
+def line_chunks(cells, skippable):
+    """
+    One chunk of bytes per line of 'cells', leaving out the cells marked in
+    'skippable' (blank cells that are already blank on screen) at either end.
+
+    A leading run is jumped over with a cursor-forward escape, which moves without
+    erasing, and a trailing run is simply not written: the line just ends early.
+    Only blank cells are ever skipped, and each line starts right after a reset,
+    so the color state of the rest of the line is unchanged.
+    """
+    width = cells.shape[1]
+    full = skippable.all(axis=1)
+    # A line with nothing to write has an empty range, and is just its LINE_END
+    lead = np.where(full, 0, np.argmin(skippable, axis=1))
+    stop = np.where(full, 0, width - np.argmin(skippable[:, ::-1], axis=1))
+    # The escape itself is at least 4 bytes, so shorter runs are cheaper as spaces
+    lead[lead <= 4] = 0
+
+    chunks = []
+    for row, start, end in zip(cells, lead.tolist(), stop.tolist()):
+        head = CURSOR_FORWARD % start if start else b""
+        chunks.append(head + b"".join(row[start:end]) + LINE_END)
+    return chunks
+
+
+def write_frame(chunks):
+    """
+    Write a frame's byte chunks to stdout with as few syscalls as possible.
+
+    Where os.writev exists the chunks go straight to the file descriptor in one
+    scatter/gather call (looping only on partial writes), without joining them
+    into a new buffer first. Elsewhere (e.g. Windows) they are joined and written
+    through sys.stdout.buffer.
+    """
+    if not hasattr(os, "writev"):
+        sys.stdout.buffer.write(b"".join(chunks))
+        sys.stdout.buffer.flush()
+        return
+
+    # Anything print()ed earlier must reach the terminal first
+    sys.stdout.flush()
+    fd = sys.stdout.fileno()
+    start = 0
+    while start < len(chunks):
+        written = os.writev(fd, chunks[start:start + IOV_MAX])
+        # Skip the chunks that went out whole, and trim a partly written one
+        while start < len(chunks) and written >= len(chunks[start]):
+            written -= len(chunks[start])
+            start += 1
+        if written:
+            chunks[start] = chunks[start][written:]
+
+
+class FrameReader:
+    """
+    Double-buffered wrapper around a cv2.VideoCapture: a background thread keeps
+    decoding up to 'buffered' frames ahead, so decoding overlaps with rendering
+    and writing instead of running in series with them. cv2 releases the GIL
+    while it decodes.
+
+    read() returns (ret, frame) just like cap.read(). Call close() before
+    releasing the capture.
+    """
+
+    def __init__(self, cap, buffered=2):
+        self.cap = cap
+        self.frames = queue.Queue(maxsize=buffered)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._decode, daemon=True)
+        self.thread.start()
+
+    def _decode(self):
+        while not self.stopped.is_set():
+            ret, frame = self.cap.read()
+            self.frames.put((ret, frame))
+            if not ret:
+                break  # end of video
+
+    def read(self):
+        return self.frames.get()
+
+    def close(self):
+        self.stopped.set()
+        # Make room in case the thread is blocked handing over a frame
+        while self.thread.is_alive():
+            try:
+                self.frames.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
 def print_video_as_text(
     video_path,
     letters="DIONELA",
     downscale=0.1,
     fps_limit=None,
-    background_threshold=None
+    background_threshold=None,
+    half_blocks=False,
+    interpolation=None,
+    truecolor=True
 ):
     """
     Streams a video as colored text (using ANSI escape sequences) in your console.
@@ -30,6 +324,22 @@ def print_video_as_text(
         Example: (10,10,10) – any pixel whose BGR is all <=10 is replaced with space.
         This is a simple approach to skip “background.” 
         For more advanced silhouette detection, see note below.
+    half_blocks : bool
+        If True, draw half-block characters (▀) instead of letters: each terminal
+        cell shows two pixels stacked vertically (foreground = top pixel,
+        background = bottom pixel). Terminal cells are about twice as tall as
+        they are wide, so the picture keeps its aspect ratio on half as many
+        lines. 'letters' is not used in this mode.
+    interpolation : int or None
+        cv2 interpolation flag used to downscale frames (e.g. cv2.INTER_AREA).
+        If None, uses INTER_AREA for downscale >= 0.25 and the much cheaper
+        INTER_NEAREST for stronger downscales.
+    truecolor : bool
+        If True, use 24-bit color codes (\033[38;2;R;G;B m). If False, quantize
+        colors to the 6×6×6 cube of the 256-color palette and use the shorter
+        \033[38;5;N m codes, for terminals without truecolor or slow links
+        such as SSH sessions. Fewer distinct colors also means longer runs of
+        the same color, so far fewer codes are emitted.
     """
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
@@ -48,70 +358,86 @@ def print_video_as_text(
     orig_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     orig_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 
+    if interpolation is None:
+        interpolation = default_interpolation(downscale)
+
     # Compute scaled size
     new_w = max(1, int(orig_w * downscale))
     new_h = max(1, int(orig_h * downscale))
+    if half_blocks:
+        # Pixel rows are consumed in pairs, one pair per line of text
+        new_h += new_h % 2
 
     print(f"Original size: {orig_w} x {orig_h}, scaled to: {new_w} x {new_h}")
     print(f"Video FPS: {video_fps:.2f}, displaying at ~{fps_limit:.2f} FPS")
     print("Press Ctrl+C to stop.\n")
     time.sleep(1)
 
-    # For cycling letters
+    # For cycling letters. The sequence never changes, so lay it out once for a
+    # whole frame (plus one spare cycle, so it can start at any letter) and just
+    # slice it each frame.
     letter_count = len(letters)
-    global_letter_index = 0  # increment as we go across each pixel
+    letter_bytes = np.array([letter.encode() for letter in letters], dtype=object)
+    letter_cycle = letter_bytes[np.arange(new_h * new_w + letter_count) % letter_count]
+    global_letter_index = 0  # advances by the number of letters drawn each frame
 
-    # We'll read frames in a loop
+    # Cells that were blank in the previous frame. Nothing is known to be on
+    # screen before the first frame, so all of it is written out.
+    prev_blank = np.zeros((new_h // 2 if half_blocks else new_h, new_w), dtype=bool)
+
+    # We'll read frames in a loop, decoded ahead on a background thread
+    reader = FrameReader(cap)
     last_time = time.time()
     try:
         while True:
-            ret, frame = cap.read()
+            ret, frame = reader.read()
             if not ret:
                 break  # end of video
 
             # Resize the frame (downscale)
-            small_frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
-
-            # Move the cursor to top-left (so we overwrite the console output)
-            # \033[H moves cursor to top-left; \033[J can clear screen below the cursor if you want
-            # But clearing the whole screen each frame can flicker. We'll just move to top for overwriting.
-            print("\033[H", end="")
-
-            # Build the text output for this frame row by row
-            text_lines = []
-            for y in range(new_h):
-                line_chars = []
-                for x in range(new_w):
-                    b, g, r = small_frame[y, x]
-
-                    # OPTIONAL: skip background-like pixels if you want a "silhouette" effect
-                    # e.g., if they're nearly black or below a certain threshold
-                    if background_threshold is not None:
-                        tb, tg, tr = background_threshold
-                        if b <= tb and g <= tg and r <= tr:
-                            # Use blank space (no letter) instead
-                            line_chars.append(" ")
-                            continue
-
-                    # Choose the next letter in "DIONELA"
-                    letter = letters[global_letter_index % letter_count]
-                    global_letter_index += 1
-
-                    # Construct the ANSI color code (foreground color)
-                    # \033[38;2;R;G;B m  -- set truecolor text
-                    color_code = f"\033[38;2;{r};{g};{b}m"
-                    # Combine color code + letter + reset
-                    # We won't reset after *every* letter, just after the line, for performance
-                    line_chars.append(color_code + letter)
-                
-                # Reset color at the end of the line, then join
-                text_lines.append("".join(line_chars) + "\033[0m")
-
-            # Join all lines with newline
-            frame_text = "\n".join(text_lines)
-
-            # Print it in one go
-            print(frame_text)
+            small_frame = downscale_frame(frame, (new_w, new_h), interpolation)
+            # Split into contiguous B, G, R planes so every per-channel pass below
+            # (threshold test, color code lookup) reads one dense array
+            b, g, r = cv2.split(small_frame)
+
+            # OPTIONAL: skip background-like pixels if you want a "silhouette" effect
+            # e.g., if they're nearly black or below a certain threshold
+            if background_threshold is not None:
+                drawn = background_mask(small_frame, background_threshold) == 0
+            else:
+                drawn = np.ones((new_h, new_w), dtype=bool)
+
+            # One color key per pixel: cheap to compare for runs and to dedupe
+            keys = pack_colors(b, g, r) if truecolor else cube_colors(b, g, r)
+            if half_blocks:
+                cells = half_block_cells(keys, drawn, truecolor)
+            else:
+                cells = letter_cells(keys, drawn, letter_cycle, global_letter_index, truecolor)
+                global_letter_index = (global_letter_index + int(np.count_nonzero(drawn))) % letter_count
+
+            # Move the cursor to top-left first (so we overwrite the console output).
+            # \033[J could clear the screen below the cursor, but clearing the whole
+            # screen each frame can flicker. We'll just move to top for overwriting.
+            # Then one chunk per line, with the color reset at the end of each line.
+            # We won't reset after *every* letter, just after the line, for performance
+            # Background cells that were already blank on screen aren't rewritten.
+            # That needs every line to stay on its own screen row: a frame that
+            # doesn't fit the terminal wraps or scrolls it, so it is written out in
+            # full, and so is the next one since the screen no longer lines up.
+            blank = cells == b" "
+            terminal = shutil.get_terminal_size()
+            if cells.shape[1] < terminal.columns and cells.shape[0] < terminal.lines:
+                skippable = blank & prev_blank
+                prev_blank = blank
+            else:
+                skippable = np.zeros_like(blank)
+                prev_blank = skippable
+            chunks = [CURSOR_HOME]
+            chunks.extend(line_chunks(cells, skippable))
+
+            # Hand the whole frame to the OS at once, skipping the text layer's
+            # re-encoding and line buffering
+            write_frame(chunks)
 
             # Wait enough to maintain fps_limit
             now = time.time()
@@ -124,6 +450,7 @@ def print_video_as_text(
     except KeyboardInterrupt:
         print("\nInterrupted by user.")
     finally:
+        reader.close()
         cap.release()
         print("Done.")
 
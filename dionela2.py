@@ -1,6 +1,148 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 
+from dionela import background_mask, default_interpolation, downscale_frame
+
+try:
+    import numba
+except ImportError:  # Numba is optional; without it frames are composited with NumPy
+    numba = None
+
+try:
+    import dionela_render
+except ImportError:  # Compiled extension for the cython backend; see dionela_render.pyx
+    dionela_render = None
+
+try:
+    import cupy
+except ImportError:  # CuPy is optional; it is only needed for the cuda backend
+    cupy = None
+
+# CUDA kernel for the cuda backend: one thread per output pixel. The downscaled
+# frame is uploaded as three separate B, G, R planes so neighbouring threads read
+# neighbouring bytes of a plane instead of striding over interleaved pixels.
+TEXT_FRAME_KERNEL = r"""
+extern "C" __global__
+void render_text_frame(
+    unsigned char *text_frame,
+    const unsigned char *small_planes,
+    const unsigned char *glyph_stack,
+    const int *letter_idx_map,
+    int new_h,
+    int new_w,
+    int cell_size)
+{
+    int out_w = new_w * cell_size;
+    int out_h = new_h * cell_size;
+    int j = blockIdx.x * blockDim.x + threadIdx.x;
+    int i = blockIdx.y * blockDim.y + threadIdx.y;
+    if (i >= out_h || j >= out_w) {
+        return;
+    }
+
+    int cell = (i / cell_size) * new_w + j / cell_size;
+    int alpha = glyph_stack[
+        (letter_idx_map[cell] * cell_size + i % cell_size) * cell_size + j % cell_size
+    ];
+    int plane_size = new_h * new_w;
+    unsigned char *pixel = text_frame + ((long long)i * out_w + j) * 3;
+    for (int c = 0; c < 3; c++) {
+        pixel[c] = (unsigned char)(alpha * small_planes[c * plane_size + cell] / 255);
+    }
+}
+"""
+
+
+def build_glyph_stack(letters, cell_size, font, font_scale, thickness):
+    """
+    Rasterize each letter once into a cell_size×cell_size grayscale alpha mask.
+
+    Returns a (len(letters), cell_size, cell_size) uint8 array where glyph k is
+    letters[k] drawn in white on black, at the same spot inside the cell that
+    the per-cell cv2.putText used to draw it.
+    """
+    glyph_stack = np.zeros((len(letters), cell_size, cell_size), dtype=np.uint8)
+    for k, letter in enumerate(letters):
+        cv2.putText(
+            glyph_stack[k],
+            letter,
+            (2, cell_size - 2),
+            font,
+            font_scale,
+            255,
+            thickness=thickness,
+            lineType=cv2.LINE_AA
+        )
+    return glyph_stack
+
+
+def composite_rows(text_frame, small_frame, alpha, cell_size, y0, y1, x0, x1):
+    """
+    Composite rows y0:y1, columns x0:x1 of cells with the NumPy backend: each cell
+    is its glyph alpha tinted with the downscaled pixel's color.
+
+    The colors are upsampled to one per output pixel with a nearest-neighbour
+    resize, then multiplied by the full-size 3-channel 'alpha' layout with
+    cv2.multiply, which runs OpenCV's SIMD kernels straight into the output
+    rows without any uint16 temporaries. Calls on disjoint row ranges touch
+    disjoint memory and OpenCV releases the GIL, so row bands can be composited
+    on several threads at once.
+    """
+    block = (slice(y0 * cell_size, y1 * cell_size), slice(x0 * cell_size, x1 * cell_size))
+    color = cv2.resize(
+        small_frame[y0:y1, x0:x1],
+        ((x1 - x0) * cell_size, (y1 - y0) * cell_size),
+        interpolation=cv2.INTER_NEAREST
+    )
+    cv2.multiply(alpha[block], color, dst=text_frame[block], scale=1 / 255)
+
+
+def clear_outside(text_frame, cell_size, dirty, rect):
+    """
+    Black out the cells of the (y0, y1, x0, x1) block 'dirty' that fall outside
+    the block 'rect', which is about to be redrawn anyway. That is at most four
+    strips: above, below, left and right of 'rect'.
+    """
+    dy0, dy1, dx0, dx1 = dirty
+    y0, y1, x0, x1 = rect
+    strips = (
+        (dy0, min(dy1, y0), dx0, dx1),
+        (max(dy0, y1), dy1, dx0, dx1),
+        (max(dy0, y0), min(dy1, y1), dx0, min(dx1, x0)),
+        (max(dy0, y0), min(dy1, y1), max(dx0, x1), dx1),
+    )
+    for sy0, sy1, sx0, sx1 in strips:
+        if sy0 < sy1 and sx0 < sx1:
+            text_frame[sy0 * cell_size:sy1 * cell_size, sx0 * cell_size:sx1 * cell_size] = 0
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True, nogil=True)
+    def render_text_frame_numba(text_frame, small_frame, glyph_stack, letter_idx_map, cell_size):
+        """
+        Write every cell of text_frame as its glyph tinted with the pixel's color.
+
+        Rows of cells are spread across cores with prange; each cell is a plain
+        loop over the glyph, so no Python objects are touched per pixel.
+        """
+        new_h, new_w = letter_idx_map.shape
+        for y in numba.prange(new_h):
+            for x in range(new_w):
+                glyph = glyph_stack[letter_idx_map[y, x]]
+                for c in range(3):
+                    color = np.uint16(small_frame[y, x, c])
+                    for i in range(cell_size):
+                        for j in range(cell_size):
+                            text_frame[y * cell_size + i, x * cell_size + j, c] = (
+                                glyph[i, j] * color // 255
+                            )
+
+
 def video_to_dionela_text_video_horizontal(
     input_video_path,
     output_video_path="dionela_text_art_horizontal.mp4",
@@ -9,7 +151,9 @@ def video_to_dionela_text_video_horizontal(
     cell_size=12,
     font_scale=0.4,
     thickness=1,
-    background_threshold=None
+    background_threshold=None,
+    backend="auto",
+    interpolation=None
 ):
     """
     Convert each frame of a video into a text-art frame using letters from 'letters'.
@@ -38,7 +182,38 @@ def video_to_dionela_text_video_horizontal(
         (B, G, R) threshold. If set, any pixel whose B, G, R are all <= that threshold
         is treated as "background" and skipped (the cell remains black).
         e.g. (30,30,30) to skip near-dark pixels for a silhouette effect.
+    backend : str
+        How frames are composited: "numpy", "numba" (a parallel JIT kernel,
+        requires the optional numba package), "cython" (a compiled parallel
+        kernel, requires building dionela_render.pyx), "cuda" (a GPU kernel,
+        requires the optional cupy package and an NVIDIA GPU), or "auto" to
+        use Numba when it is installed, else the Cython kernel when it is
+        built, else NumPy.
+    interpolation : int or None
+        cv2 interpolation flag used to downscale frames (e.g. cv2.INTER_AREA).
+        If None, uses INTER_AREA for downscale >= 0.25 and the much cheaper
+        INTER_NEAREST for stronger downscales.
     """
+    if backend == "auto":
+        if numba is not None:
+            backend = "numba"
+        elif dionela_render is not None:
+            backend = "cython"
+        else:
+            backend = "numpy"
+    if backend not in ("numpy", "numba", "cython", "cuda"):
+        print(f"Error: Unknown backend {backend!r}")
+        return
+    if backend == "numba" and numba is None:
+        print("Error: The numba backend requires the numba package")
+        return
+    if backend == "cython" and dionela_render is None:
+        print("Error: The cython backend requires building dionela_render.pyx (cythonize -i dionela_render.pyx)")
+        return
+    if backend == "cuda" and cupy is None:
+        print("Error: The cuda backend requires the cupy package")
+        return
+
     cap = cv2.VideoCapture(input_video_path)
     if not cap.isOpened():
         print(f"Error: Cannot open video {input_video_path}")
@@ -50,6 +225,9 @@ def video_to_dionela_text_video_horizontal(
     fps = cap.get(cv2.CAP_PROP_FPS)
     frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
+    if interpolation is None:
+        interpolation = default_interpolation(downscale)
+
     # Compute new size after downscaling
     new_w = max(1, int(orig_w * downscale))
     new_h = max(1, int(orig_h * downscale))
@@ -69,63 +247,248 @@ def video_to_dionela_text_video_horizontal(
     font = cv2.FONT_HERSHEY_SIMPLEX
     letter_count = len(letters)
 
-    frame_index = 0
+    # Draw every letter once up front; frames are then composited from these sprites
+    glyph_stack = build_glyph_stack(letters, cell_size, font, font_scale, thickness)
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break  # end of video
+    # Choose the letter based on the column only
+    # Each row restarts the cycle at letters[0]
+    letter_idx_row = np.arange(new_w) % letter_count
 
-        frame_index += 1
+    # The Numba, Cython and CUDA kernels look each cell's glyph up by index
+    letter_idx_map = np.ascontiguousarray(
+        np.broadcast_to(letter_idx_row, (new_h, new_w)), dtype=np.intp
+    )
+
+    if backend == "cuda":
+        # Glyphs, letter map and the output canvas live on the GPU for the whole video
+        render_text_frame_cuda = cupy.RawKernel(TEXT_FRAME_KERNEL, "render_text_frame")
+        glyph_stack_gpu = cupy.asarray(glyph_stack)
+        letter_idx_map_gpu = cupy.asarray(letter_idx_map, dtype=cupy.int32)
+        text_frame_gpu = cupy.empty((out_h, out_w, 3), dtype=cupy.uint8)
+        block = (32, 8)
+        grid = ((out_w + block[0] - 1) // block[0], (out_h + block[1] - 1) // block[1])
+
+    if backend == "numpy":
+        # Alpha of the whole output frame, one value per pixel and channel. The
+        # letters only depend on the column, so build one row of cells and repeat it.
+        alpha_row = glyph_stack[letter_idx_row].transpose(1, 0, 2).reshape(cell_size, out_w)
+        alpha = np.repeat(np.tile(alpha_row, (new_h, 1))[:, :, None], 3, axis=2)
+
+        # The compositor splits each frame into one band of rows per core
+        workers = os.cpu_count() or 1
+        executor = ThreadPoolExecutor(max_workers=workers)
 
+    def render_frame(frame, text_frame, dirty):
+        """
+        Render one decoded video frame into the text-art frame buffer 'text_frame'.
+
+        'dirty' is the (y0, y1, x0, x1) block of cells that the buffer's previous
+        frame drew into. Returns the block of cells that this frame drew into.
+        """
         # Downscale the frame
-        small_frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
+        small_frame = downscale_frame(frame, (new_w, new_h), interpolation)
 
-        # Create a black canvas for text-art frame
-        text_frame = np.zeros((out_h, out_w, 3), dtype=np.uint8)
+        # If using background threshold, skip near-dark (or near some color) pixels
+        rect = (0, new_h, 0, new_w)
+        if background_threshold is not None:
+            bg_mask = background_mask(small_frame, background_threshold)
+            # Blacking out the pixel blacks out its whole cell (the cell remains black)
+            small_frame[bg_mask != 0] = 0
+            # Only the bounding box of the foreground needs compositing
+            x, y, w, h = cv2.boundingRect(cv2.bitwise_not(bg_mask))
+            rect = (y, y + h, x, x + w)
 
-        for y in range(new_h):
-            for x in range(new_w):
-                b, g, r = small_frame[y, x]
-
-                # If using background threshold, skip near-dark (or near some color) pixels
-                if background_threshold is not None:
-                    th_b, th_g, th_r = background_threshold
-                    if b <= th_b and g <= th_g and r <= th_r:
-                        # Don't draw a letter (i.e., cell remains black)
-                        continue
-
-                # Choose the letter based on the column only
-                # Each row restarts the cycle at letters[0]
-                letter = letters[x % letter_count]
-
-                # Calculate the cell's top-left corner in the output image
-                cell_x = x * cell_size
-                cell_y = y * cell_size
-
-                # Position to put the text (roughly near the bottom-left of each cell)
-                text_x = cell_x + 2
-                text_y = cell_y + cell_size - 2
-
-                # Draw the letter with the BGR color from the pixel
-                cv2.putText(
-                    text_frame,
-                    letter,
-                    (text_x, text_y),
-                    font,
-                    font_scale,
-                    (int(b), int(g), int(r)),
-                    thickness=thickness,
-                    lineType=cv2.LINE_AA
+        if backend == "cuda":
+            # Only the small frame goes up and the finished frame comes back down
+            small_planes_gpu = cupy.asarray(np.ascontiguousarray(small_frame.transpose(2, 0, 1)))
+            render_text_frame_cuda(
+                grid,
+                block,
+                (
+                    text_frame_gpu,
+                    small_planes_gpu,
+                    glyph_stack_gpu,
+                    letter_idx_map_gpu,
+                    np.int32(new_h),
+                    np.int32(new_w),
+                    np.int32(cell_size),
                 )
+            )
+            text_frame_gpu.get(out=text_frame)
+            return (0, new_h, 0, new_w)
+
+        # Black out what the buffer's previous frame drew outside this frame's box.
+        # Without a background threshold both cover the whole frame: nothing to clear.
+        clear_outside(text_frame, cell_size, dirty, rect)
+
+        y0, y1, x0, x1 = rect
+        if y0 == y1:
+            return rect  # all background
+        block = (slice(y0 * cell_size, y1 * cell_size), slice(x0 * cell_size, x1 * cell_size))
+
+        if backend == "numba":
+            render_text_frame_numba(
+                text_frame[block], small_frame[y0:y1, x0:x1], glyph_stack,
+                letter_idx_map[y0:y1, x0:x1], cell_size
+            )
+        elif backend == "cython":
+            dionela_render.render_text_frame(
+                text_frame[block], small_frame[y0:y1, x0:x1], glyph_stack,
+                letter_idx_map[y0:y1, x0:x1], cell_size
+            )
+        else:
+            # Every cell is its glyph tinted with the BGR color from the pixel, so the
+            # whole frame is a single multiply of the alpha layout by the colors
+            # upsampled to one color per cell
+            row_bounds = np.linspace(y0, y1, min(y1 - y0, workers) + 1).astype(int)
+            futures = [
+                executor.submit(
+                    composite_rows, text_frame, small_frame, alpha, cell_size, band_y0, band_y1, x0, x1
+                )
+                for band_y0, band_y1 in zip(row_bounds[:-1], row_bounds[1:])
+            ]
+            for future in futures:
+                future.result()
+        return rect
+
+    # Decoding, rendering and encoding run as a pipeline so they overlap: a reader
+    # thread feeds decoded frames to the render workers, and this thread writes the
+    # finished frames. The compiled and CUDA backends are parallel on their own (and
+    # the GPU canvas is shared), so they render on this thread instead, as a single
+    # worker, and the frames are written on a thread of their own. Their parallel
+    # kernels are never run from a worker thread: with Numba's TBB threading layer
+    # that keeps the interpreter from exiting.
+    render_workers = 1 if backend in ("numba", "cython", "cuda") else 2
+    decoded = queue.Queue(maxsize=4)
+    rendered = queue.Queue(maxsize=4)
+
+    # Output frames are recycled instead of allocated per frame: the writer hands
+    # each buffer back once it is encoded, along with the block of cells its frame
+    # drew into, so only that block needs clearing next time. A fresh buffer
+    # counts as dirty everywhere. There is one buffer for each frame that can be
+    # in flight at a time.
+    free_frames = queue.Queue()
+    for _ in range(render_workers + rendered.maxsize):
+        free_frames.put((np.empty((out_h, out_w, 3), dtype=np.uint8), (0, new_h, 0, new_w)))
+
+    # Set when the pipeline has to stop early, e.g. after a render error
+    stopped = threading.Event()
+
+    def read_frames():
+        frame_index = 0
+        while not stopped.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                break  # end of video
+            decoded.put((frame_index, frame))
+            frame_index += 1
+        # One end-of-video marker per render worker
+        for _ in range(render_workers):
+            decoded.put(None)
+
+    def render_frames():
+        try:
+            while True:
+                # Take a buffer before the frame, so whoever holds the oldest
+                # unwritten frame can always finish it
+                text_frame, dirty = free_frames.get()
+                item = decoded.get()
+                if item is None or stopped.is_set():
+                    break
+                frame_index, frame = item
+                dirty = render_frame(frame, text_frame, dirty)
+                rendered.put((frame_index, text_frame, dirty))
+        except BaseException as exc:
+            # Hand the error to the writer, which stops the pipeline and re-raises it
+            rendered.put(exc)
+        finally:
+            # Always report back, so the writer never waits on a dead worker
+            rendered.put(None)
+
+    def stop_pipeline(finished_workers):
+        """
+        Stop the reader and the render workers early, and wait until they are done.
+
+        Any of them may be blocked on a queue: workers get a placeholder buffer
+        and end-of-video markers, and the decoded and rendered queues are kept
+        drained so nobody waits for room in them.
+        """
+        stopped.set()
+        for _ in range(render_workers):
+            free_frames.put((None, None))
+        while finished_workers < render_workers or reader.is_alive():
+            while True:
+                try:
+                    decoded.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                for _ in range(render_workers):
+                    decoded.put_nowait(None)
+            except queue.Full:
+                pass  # the reader is still handing over its own markers
+            try:
+                if rendered.get(timeout=0.1) is None:
+                    finished_workers += 1
+            except queue.Empty:
+                pass
+
+    def write_frames():
+        # Workers can finish frames out of order; hold those back until every
+        # earlier frame has been written, so VideoWriter sees them in order
+        pending = {}
+        frames_written = 0
+        finished_workers = 0
+        try:
+            while finished_workers < render_workers:
+                item = rendered.get()
+                if item is None:
+                    finished_workers += 1
+                    continue
+                if isinstance(item, BaseException):
+                    raise item
+
+                frame_index, text_frame, dirty = item
+                pending[frame_index] = (text_frame, dirty)
+                while frames_written in pending:
+                    text_frame, dirty = pending.pop(frames_written)
+                    out.write(text_frame)
+                    free_frames.put((text_frame, dirty))
+                    frames_written += 1
+
+                    if frames_written % 10 == 0:
+                        print(f"Processing frame {frames_written}/{frame_count}", end='\r')
+        except BaseException:
+            stop_pipeline(finished_workers)
+            raise
 
-        out.write(text_frame)
+    writer_errors = []
 
-        if frame_index % 10 == 0:
-            print(f"Processing frame {frame_index}/{frame_count}", end='\r')
+    def write_frames_in_background():
+        try:
+            write_frames()
+        except BaseException as exc:
+            writer_errors.append(exc)
 
-    cap.release()
-    out.release()
+    reader = threading.Thread(target=read_frames, daemon=True)
+    reader.start()
+    try:
+        if backend == "numpy":
+            for _ in range(render_workers):
+                threading.Thread(target=render_frames, daemon=True).start()
+            write_frames()
+        else:
+            writer = threading.Thread(target=write_frames_in_background, daemon=True)
+            writer.start()
+            render_frames()
+            writer.join()
+            if writer_errors:
+                raise writer_errors[0]
+    finally:
+        if backend == "numpy":
+            executor.shutdown()
+        cap.release()
+        out.release()
     print("\nDone processing frames.")
     print("Output saved to:", output_video_path)
 
@@ -0,0 +1,45 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+# distutils: extra_compile_args = -fopenmp
+# distutils: extra_link_args = -fopenmp
+"""
+Compiled text-frame compositor used by dionela2.py's "cython" backend.
+
+Build it in place, next to dionela2.py, with:
+
+    pip install cython
+    cythonize -i dionela_render.pyx
+
+The OpenMP flags above are for GCC/Clang; with MSVC use /openmp instead.
+"""
+from cython.parallel import prange
+
+
+def render_text_frame(
+    unsigned char[:, :, :] text_frame,
+    const unsigned char[:, :, :] small_frame,
+    const unsigned char[:, :, ::1] glyph_stack,
+    const Py_ssize_t[:, :] letter_idx_map,
+    int cell_size
+):
+    """
+    Write every cell of text_frame as its glyph tinted with the pixel's color.
+
+    Same arguments and result as dionela2.render_text_frame_numba; the loops run
+    without the GIL and rows of cells are spread across cores with prange. The
+    frame arguments may be strided views, so a sub-block of cells can be drawn.
+    """
+    cdef Py_ssize_t new_h = letter_idx_map.shape[0]
+    cdef Py_ssize_t new_w = letter_idx_map.shape[1]
+    cdef Py_ssize_t y, x, i, j, c, k
+    cdef unsigned int alpha
+
+    for y in prange(new_h, nogil=True, schedule="static"):
+        for x in range(new_w):
+            k = letter_idx_map[y, x]
+            for i in range(cell_size):
+                for j in range(cell_size):
+                    alpha = glyph_stack[k, i, j]
+                    for c in range(3):
+                        text_frame[y * cell_size + i, x * cell_size + j, c] = <unsigned char>(
+                            alpha * small_frame[y, x, c] // 255
+                        )